@@ -5,17 +5,27 @@ from __future__ import annotations
 
 import os
 import re
-import json
 import time
+import hashlib
 import logging
+import tempfile
 import argparse
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
+from typing import BinaryIO
 from urllib.parse import urljoin, urlparse, parse_qs
 
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import lxml.etree
+import lxml.html
 from dotenv import load_dotenv
-from PyPDF2 import PdfReader
+import pymupdf
 
 from supabase import create_client, Client
 
@@ -37,6 +47,11 @@ MONTHS = {
     "december": 12,
 }
 
+_ENGLISH_URL_RE = re.compile(r"/archives/(\d{4})/([a-z]+)/english/?$")
+_ENGLISH_SUFFIX = re.compile(r"\s*-\s*English\s*$", re.IGNORECASE)
+_WS_BEFORE_NL = re.compile(r"[ \t]+\n")
+_MULTI_NL = re.compile(r"\n{3,}")
+
 DEFAULT_HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -50,9 +65,14 @@ DOWNLOAD_DIR = PROJECT_ROOT / "downloads"
 LOG_DIR = PROJECT_ROOT / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 
+HTTP_CACHE_DIR = PROJECT_ROOT / ".httpcache"
+
 STATE_PATH = PROJECT_ROOT / "state.json"
 LOG_PATH = LOG_DIR / "collector.log"
-SKIPPED_LOG_PATH = LOG_DIR / "skipped.json"
+SKIPPED_LOG_PATH = LOG_DIR / "skipped.jsonl"
+
+# 記事はこの件数ごとにまとめて upsert する（state.json もその都度書き出す）
+UPSERT_BATCH_SIZE = 50
 
 logging.basicConfig(
     level=logging.INFO,
@@ -80,41 +100,116 @@ def get_supabase() -> Client:
     return create_client(url, key)
 
 
+def get_session(pool_size: int = 8) -> requests.Session:
+    # ワーカー数ぶん接続を使い回せるようプールを広げ、リトライはアダプタ層に任せる
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=max(pool_size, 1),
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+    )
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
 def load_state() -> dict:
     if STATE_PATH.exists():
         try:
-            return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+            return orjson.loads(STATE_PATH.read_bytes())
         except Exception:
             pass
     return {"processed_english_pages": []}
 
 
 def save_state(state: dict) -> None:
-    STATE_PATH.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    STATE_PATH.write_bytes(orjson.dumps(state, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
 
 
-def append_skipped(item: dict) -> None:
-    arr = []
-    if SKIPPED_LOG_PATH.exists():
-        try:
-            arr = json.loads(SKIPPED_LOG_PATH.read_text(encoding="utf-8"))
-        except Exception:
-            arr = []
-    arr.append(item)
-    SKIPPED_LOG_PATH.write_text(json.dumps(arr, ensure_ascii=False, indent=2), encoding="utf-8")
+def append_skipped(item: dict, fh: BinaryIO) -> None:
+    # JSON Lines で追記する（1行 = 1件）
+    fh.write(orjson.dumps(item) + b"\n")
+    fh.flush()
 
 
-def fetch(session: requests.Session, url: str) -> str:
-    r = session.get(url, timeout=60)
+def write_cache(cache_path: Path, entry: dict) -> None:
+    # 一時ファイルに書いてから置き換え、並列ワーカーや中断で壊れたキャッシュを残さない
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=HTTP_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(entry))
+        os.replace(tmp, cache_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def fetch(session: requests.Session, url: str, cache_ttl: float | None = 0) -> str:
+    """
+    HTML を取得する。cache_ttl が None ならキャッシュしない。
+    それ以外は .httpcache に本文と ETag / Last-Modified を保存し（tools/fetch_ccps_keyword_map.py と同じ形式）、
+    保存から cache_ttl 秒以内ならそのまま返し、それ以降は条件付き GET で取り直して 304 なら保存済みの本文を使う。
+    """
+    if cache_ttl is None:
+        r = session.get(url, timeout=60)
+        r.raise_for_status()
+        return r.text
+
+    cache_path = HTTP_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+    cached = None
+    if cache_path.exists():
+        try:
+            cached = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            cached = None
+
+    if cached is not None and time.time() - cache_path.stat().st_mtime < cache_ttl:
+        return cached["text"]
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = session.get(url, headers=headers, timeout=60)
+    if cached is not None and r.status_code == 304:
+        # 変更なし: 保存済みの本文を使い、TTL の起点だけ更新する
+        os.utime(cache_path)
+        return cached["text"]
     r.raise_for_status()
+
+    write_cache(
+        cache_path,
+        {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "text": r.text,
+        },
+    )
     return r.text
 
 
-def parse_last_page_num(html: str) -> int:
-    soup = BeautifulSoup(html, "html.parser")
+def parse_html(html: str) -> lxml.html.HtmlElement | None:
+    # 空のレスポンスなら None。XML の encoding 宣言付きでも読めるよう UTF-8 の bytes として渡す
+    if not html.strip():
+        return None
+    try:
+        return lxml.html.fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:
+        return None
+
+
+def parse_last_page_num(tree: lxml.html.HtmlElement | None) -> int:
     max_page = 0
-    for a in soup.find_all("a", href=True):
-        full = urljoin(ARCHIVES_ROOT, a["href"])
+    if tree is None:
+        return max_page
+    for href in tree.xpath("//a/@href"):
+        full = urljoin(ARCHIVES_ROOT, href)
         qs = parse_qs(urlparse(full).query)
         if "page" in qs:
             try:
@@ -125,18 +220,21 @@ def parse_last_page_num(html: str) -> int:
     return max_page
 
 
-def extract_english_links_from_archive_page(html: str) -> list[str]:
-    soup = BeautifulSoup(html, "html.parser")
+def extract_english_links_from_archive_page(tree: lxml.html.HtmlElement | None) -> list[str]:
     out = []
-    for a in soup.find_all("a", href=True):
-        full = urljoin(ARCHIVES_ROOT, a["href"])
-        if re.search(r"/archives/\d{4}/[a-z]+/english/?$", full):
+    if tree is None:
+        return out
+    # "/english" を含む href だけ XPath 側で絞り込み、残りに正規表現をかける
+    for href in tree.xpath('//a[contains(@href, "/english")]/@href'):
+        full = urljoin(ARCHIVES_ROOT, href)
+        if _ENGLISH_URL_RE.search(full):
             out.append(full.rstrip("/"))
     return out
 
 
+@lru_cache(maxsize=4096)
 def parse_year_month_from_english_url(url: str) -> tuple[int, int] | None:
-    m = re.search(r"/archives/(\d{4})/([a-z]+)/english/?$", url)
+    m = _ENGLISH_URL_RE.search(url)
     if not m:
         return None
     year = int(m.group(1))
@@ -146,22 +244,29 @@ def parse_year_month_from_english_url(url: str) -> tuple[int, int] | None:
     return year, month
 
 
-def discover_english_pages(session: requests.Session, min_year: int = 2001, max_pages: int | None = None) -> list[str]:
-    first_html = fetch(session, ARCHIVES_ROOT)
-    last_page = parse_last_page_num(first_html)
+def discover_english_pages(
+    session: requests.Session,
+    min_year: int = 2001,
+    max_pages: int | None = None,
+    workers: int = 8,
+    cache_ttl: float | None = 0,
+    sleep_sec: float = 0.2,
+) -> list[str]:
+    # 1ページ目は総ページ数の判定とリンク抽出の両方に使うので、一度だけパースして木を使い回す
+    first_tree = parse_html(fetch(session, ARCHIVES_ROOT, cache_ttl))
+    last_page = parse_last_page_num(first_tree)
     if max_pages is not None:
         last_page = min(last_page, max_pages - 1)
 
     pages: set[str] = set()
     logger.info(f"Archives pagination detected. last_page_index={last_page}")
 
-    for page in range(0, last_page + 1):
-        url = ARCHIVES_ROOT if page == 0 else f"{ARCHIVES_ROOT}?page={page}"
-        html = fetch(session, url)
-        links = extract_english_links_from_archive_page(html)
+    def scan_page(page: int, url: str, tree: lxml.html.HtmlElement | None) -> bool:
+        # ページ内の英語リンクを拾い、続きを見る必要があれば True を返す
+        links = extract_english_links_from_archive_page(tree)
         if not links:
             logger.warning(f"No english links found at page={page} ({url}). stopping.")
-            break
+            return False
 
         years_in_page = []
         kept = 0
@@ -179,9 +284,30 @@ def discover_english_pages(session: requests.Session, min_year: int = 2001, max_
 
         if years_in_page and max(years_in_page) < min_year:
             logger.info(f"Reached pages older than min_year={min_year}. stopping at page={page}.")
-            break
-
-        time.sleep(0.2)
+            return False
+        return True
+
+    def fetch_page(url: str) -> lxml.html.HtmlElement | None:
+        if url == ARCHIVES_ROOT:
+            return first_tree
+        # 並列でもサイトに負荷をかけすぎないよう、各リクエストの前に少し待つ
+        time.sleep(sleep_sec)
+        return parse_html(fetch(session, url, cache_ttl))
+
+    # workers ページずつまとめて並列取得し、打ち切り判定は従来どおりページ順に行う
+    # （min_year より古いページに達したら、それ以降の窓は取得しない）
+    page_urls = [ARCHIVES_ROOT] + [f"{ARCHIVES_ROOT}?page={page}" for page in range(1, last_page + 1)]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for start in range(0, len(page_urls), workers):
+            window = page_urls[start : start + workers]
+            trees = ex.map(fetch_page, window)
+            stop = False
+            for k, (url, tree) in enumerate(zip(window, trees)):
+                if not scan_page(start + k, url, tree):
+                    stop = True
+                    break
+            if stop:
+                break
 
     def sort_key(u: str):
         ym = parse_year_month_from_english_url(u)
@@ -190,68 +316,131 @@ def discover_english_pages(session: requests.Session, min_year: int = 2001, max_
     return sorted(pages, key=sort_key, reverse=True)
 
 
-def extract_title_from_english_page(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    h1 = soup.find("h1")
-    title = h1.get_text(" ", strip=True) if h1 else ""
-    title = re.sub(r"\s*-\s*English\s*$", "", title, flags=re.IGNORECASE).strip()
+def extract_title_from_english_page(tree: lxml.html.HtmlElement | None) -> str:
+    h1s = tree.xpath("//h1") if tree is not None else []
+    # 子要素ごとのテキストを空白1つでつなぐ
+    title = " ".join(t.strip() for t in h1s[0].itertext() if t.strip()) if h1s else ""
+    title = _ENGLISH_SUFFIX.sub("", title).strip()
     return title
 
 
-def extract_pdf_url_from_english_page(html: str, base_url: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
+def extract_pdf_url_from_english_page(tree: lxml.html.HtmlElement | None, base_url: str) -> str:
+    if tree is None:
+        return ""
 
-    # 1) "click here to download" っぽいリンク優先
-    for a in soup.find_all("a", href=True):
-        txt = (a.get_text() or "").strip().lower()
+    first_pdf = ""
+    for a in tree.xpath("//a[@href]"):
+        href = a.get("href")
+        # 1) "click here to download" っぽいリンクが見つかれば即採用
+        txt = (a.text_content() or "").strip().lower()
         if "download" in txt and "click" in txt:
-            return urljoin(base_url + "/", a["href"])
-
-    # 2) .pdf を含むリンク
-    candidates = []
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        if href.lower().endswith(".pdf") or ".pdf" in href.lower():
-            candidates.append(urljoin(base_url + "/", href))
+            return urljoin(base_url + "/", href)
+        # 2) なければ最初に出てきた .pdf を含むリンク
+        if not first_pdf and ".pdf" in href.lower():
+            first_pdf = href
 
-    return candidates[0] if candidates else ""
+    return urljoin(base_url + "/", first_pdf) if first_pdf else ""
 
 
 def download_pdf(session: requests.Session, pdf_url: str, out_path: Path) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    r = session.get(pdf_url, timeout=120)
-    r.raise_for_status()
-    out_path.write_bytes(r.content)
+    # 本体をメモリに載せずにチャンク単位でファイルへ書き出す
+    with session.get(pdf_url, stream=True, timeout=120) as r:
+        r.raise_for_status()
+        with out_path.open("wb") as f:
+            for chunk in r.iter_content(chunk_size=1 << 18):
+                f.write(chunk)
 
 
 def extract_pdf_text(pdf_path: Path) -> str:
     try:
-        reader = PdfReader(str(pdf_path))
-        parts = []
-        for p in reader.pages:
-            parts.append(p.extract_text() or "")
+        with pymupdf.open(str(pdf_path)) as doc:
+            parts = [p.get_text("text") for p in doc]
         text = "\n".join(parts).strip()
         # 軽く整形
-        text = re.sub(r"[ \t]+\n", "\n", text)
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _WS_BEFORE_NL.sub("\n", text)
+        text = _MULTI_NL.sub("\n\n", text)
         return text
     except Exception as e:
         logger.warning(f"PDF text extraction failed: {pdf_path.name} ({e})")
         return ""
 
 
-def upload_pdf_to_storage(sb: Client, bucket: str, object_path: str, local_path: Path) -> None:
-    data = local_path.read_bytes()
-    sb.storage.from_(bucket).upload(
-        path=object_path,
-        file=data,
-        file_options={"content-type": "application/pdf", "upsert": "true"},
-    )
+def storage_object_size(sb: Client, bucket: str, object_path: str) -> int | None:
+    folder, _, name = object_path.rpartition("/")
+    for obj in sb.storage.from_(bucket).list(folder, {"search": name}):
+        if obj.get("name") == name:
+            return (obj.get("metadata") or {}).get("size")
+    return None
+
+
+def upload_pdf_to_storage(sb: Client, bucket: str, object_path: str, local_path: Path) -> bool:
+    # 同じパスに同じサイズのオブジェクトが既にあればアップロードしない
+    if storage_object_size(sb, bucket, object_path) == local_path.stat().st_size:
+        return False
+
+    with local_path.open("rb") as f:
+        sb.storage.from_(bucket).upload(
+            path=object_path,
+            file=f,
+            file_options={"content-type": "application/pdf", "upsert": "true"},
+        )
+    return True
+
+
+def fetch_article(
+    session: requests.Session,
+    english_url: str,
+    year: int,
+    month: int,
+    cache_ttl: float | None = 0,
+    sleep_sec: float = 0.2,
+) -> dict:
+    """
+    英語ページを取得して PDF をダウンロードする（ワーカースレッドで実行）。
+    ページ取得・ダウンロードそれぞれの前に sleep_sec 待つ。
+    pdf_url が見つからなければ空文字で返す。
+    """
+    time.sleep(sleep_sec)
+    tree = parse_html(fetch(session, english_url, cache_ttl))
+    title = extract_title_from_english_page(tree) or f"Process Safety Beacon {year}-{month:02d}"
+    pdf_url = extract_pdf_url_from_english_page(tree, english_url)
+    if not pdf_url:
+        return {"title": title, "pdf_url": ""}
+
+    # local pdf name
+    pdf_filename = f"{year}-{month:02d}-Beacon-English.pdf"
+    local_pdf = DOWNLOAD_DIR / pdf_filename
+
+    time.sleep(sleep_sec)
+    download_pdf(session, pdf_url, local_pdf)
+    return {"title": title, "pdf_url": pdf_url, "pdf_filename": pdf_filename, "local_pdf": local_pdf}
+
+
+def load_existing_page_urls(sb: Client, table: str) -> set[str]:
+    # 1リクエストの返却件数には上限があるので range でページングする
+    urls: set[str] = set()
+    page_size = 1000
+    offset = 0
+    while True:
+        res = (
+            sb.table(table)
+            .select("source_page_url")
+            .order("id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        rows = res.data or []
+        urls.update(r["source_page_url"] for r in rows if r.get("source_page_url"))
+        if len(rows) < page_size:
+            break
+        offset += page_size
+    return urls
 
 
-def upsert_article(sb: Client, table: str, payload: dict) -> None:
-    # source_page_url に unique index がある前提
-    sb.table(table).upsert(payload, on_conflict="source_page_url").execute()
+def upsert_articles(sb: Client, table: str, payloads: list[dict]) -> None:
+    # source_page_url に unique index がある前提（配列でまとめて1リクエスト）
+    sb.table(table).upsert(payloads, on_conflict="source_page_url").execute()
 
 
 def main():
@@ -262,7 +451,17 @@ def main():
     parser.add_argument("--bucket", type=str, default="ccps-pdfs")
     parser.add_argument("--force", action="store_true", help="state.json を無視して再処理する")
     parser.add_argument("--limit", type=int, default=None, help="process only N newest items (dry run for small test)")
+    parser.add_argument("--workers", type=int, default=8, help="ページ取得・PDFダウンロードの並列数")
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0,
+        help="保存済みの HTML をこの秒数以内なら再検証せずに使う（0=毎回 ETag / Last-Modified で再検証）",
+    )
+    parser.add_argument("--sleep", type=float, default=0.2, help="各ワーカーがリクエストの前に待つ秒数")
+    parser.add_argument("--no-cache", action="store_true", help=".httpcache を読み書きしない")
     args = parser.parse_args()
+    cache_ttl = None if args.no_cache else args.cache_ttl
 
     load_env()
 
@@ -276,87 +475,188 @@ def main():
     state = load_state()
     processed = set(state.get("processed_english_pages", []))
 
-    session = requests.Session()
-    session.headers.update(DEFAULT_HEADERS)
+    # state.json が無い／古い環境でも、登録済みの記事は再ダウンロードしない
+    if not args.force:
+        existing = load_existing_page_urls(sb, args.table)
+        logger.info(f"Existing articles in {args.table}: {len(existing)}")
+        processed |= existing
+
+    session = get_session(args.workers)
 
     logger.info("Discovering english pages...")
-    english_pages = discover_english_pages(session, min_year=args.min_year, max_pages=args.max_pages)
+    english_pages = discover_english_pages(
+        session,
+        min_year=args.min_year,
+        max_pages=args.max_pages,
+        workers=args.workers,
+        cache_ttl=cache_ttl,
+        sleep_sec=args.sleep,
+    )
     logger.info(f"Found english pages: {len(english_pages)}")
 
     done = 0
-    limit = args.limit
     skipped = 0
-
-    for english_url in english_pages:
-        if (not args.force) and (english_url in processed):
-            continue
-
-        ym = parse_year_month_from_english_url(english_url)
-        if not ym:
-            skipped += 1
-            append_skipped({"url": english_url, "reason": "bad_ym"})
-            continue
-
-        year, month = ym
-
+    payloads: list[dict] = []
+
+    def checkpoint() -> None:
+        state["processed_english_pages"] = sorted(processed)
+        save_state(state)
+
+    def flush_payloads() -> None:
+        # upsert に成功したバッチだけを処理済みにする（落ちても再実行で拾い直せる）
+        nonlocal done, skipped
+        if not payloads:
+            return
+        batch = payloads[:]
+        payloads.clear()
         try:
-            html = fetch(session, english_url)
-            title = extract_title_from_english_page(html) or f"Process Safety Beacon {year}-{month:02d}"
-            pdf_url = extract_pdf_url_from_english_page(html, english_url)
+            upsert_articles(sb, args.table, batch)
+        except Exception as e:
+            skipped += len(batch)
+            for payload in batch:
+                append_skipped(
+                    {"url": payload["source_page_url"], "reason": "upsert_failed", "error": str(e)},
+                    skipped_fh,
+                )
+            logger.exception(f"FAILED: upsert batch of {len(batch)} articles")
+            return
+
+        for payload in batch:
+            processed.add(payload["source_page_url"])
+            logger.info(
+                f"OK: {payload['published_year']}-{payload['published_month']:02d} title='{payload['title']}'"
+            )
+        done += len(batch)
+        checkpoint()
+
+    def record_failure(english_url: str, e: Exception) -> None:
+        nonlocal skipped
+        skipped += 1
+        append_skipped({"url": english_url, "reason": "exception", "error": str(e)}, skipped_fh)
+        logger.exception(f"FAILED: {english_url}")
+
+    skipped_fh = SKIPPED_LOG_PATH.open("ab")
+    try:
+        targets: list[tuple[str, int, int]] = []
+        for english_url in english_pages:
+            if (not args.force) and (english_url in processed):
+                continue
 
-            if not pdf_url:
+            ym = parse_year_month_from_english_url(english_url)
+            if not ym:
                 skipped += 1
-                append_skipped({"url": english_url, "reason": "no_pdf_url"})
-                processed.add(english_url)
-                state["processed_english_pages"] = sorted(processed)
-                save_state(state)
+                append_skipped({"url": english_url, "reason": "bad_ym"}, skipped_fh)
                 continue
 
-            # local pdf name
-            pdf_filename = f"{year}-{month:02d}-Beacon-English.pdf"
-            local_pdf = DOWNLOAD_DIR / pdf_filename
-
-            download_pdf(session, pdf_url, local_pdf)
-
-            # Extract full text
-            content = extract_pdf_text(local_pdf)
-            logger.info(f"Extracted text length={len(content)} for {pdf_filename}")
-
-            # Upload to storage
-            object_path = f"beacon/{year}/{month:02d}/{pdf_filename}"
-            upload_pdf_to_storage(sb, args.bucket, object_path, local_pdf)
-
-            # Upsert DB (全項目入れる)
-            payload = {
-                "title": title,
-                "content": content if content else None,
-                "source_page_url": english_url,
-                "source_pdf_url": pdf_url,
-                "published_year": year,
-                "published_month": month,
-                "pdf_bucket": args.bucket,
-                "pdf_path": object_path,
-            }
-            upsert_article(sb, args.table, payload)
-
-            processed.add(english_url)
-            state["processed_english_pages"] = sorted(processed)
-            save_state(state)
-
-            done += 1
-            if limit is not None and done >= limit:
-                logger.info(f"Reached limit={limit}. stopping.")
-                break
+            year, month = ym
+            targets.append((english_url, year, month))
 
-            logger.info(f"OK: {year}-{month:02d} title='{title}'")
+        # ネットワーク I/O（ページ取得 + PDF ダウンロード）はスレッドで、
+        # PDF のテキスト抽出は別プロセスで並列に行い、Supabase への書き込みはメインスレッドで完了順に処理する。
+        # PyMuPDF はスレッドセーフではないのでプロセスプールを使う（spawn: I/O スレッド稼働中の fork を避ける）
+        def new_cpu_pool() -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
 
-        except Exception as e:
-            skipped += 1
-            append_skipped({"url": english_url, "reason": "exception", "error": str(e)})
-            logger.exception(f"FAILED: {english_url}")
+        cpu_ex = new_cpu_pool()
+        try:
+            with ThreadPoolExecutor(max_workers=args.workers) as io_ex:
+                remaining = iter(targets)
+                fetches: dict = {}
+                extractions: dict = {}
+                pending: set = set()
+
+                def submit_more() -> None:
+                    # 新しい順に最大 workers 件ずつ投入する。--limit は成功件数で数えるので、
+                    # 成功済み + 処理中の件数が limit に届いたら新規投入を止める（失敗が出ればその分を補充する）
+                    while len(fetches) < args.workers:
+                        in_flight = len(fetches) + len(extractions)
+                        if args.limit is not None and done + len(payloads) + in_flight >= args.limit:
+                            return
+                        item = next(remaining, None)
+                        if item is None:
+                            return
+                        fut = io_ex.submit(fetch_article, session, *item, cache_ttl, args.sleep)
+                        fetches[fut] = item
+                        pending.add(fut)
+
+                submit_more()
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in finished:
+                        if fut in fetches:
+                            english_url, year, month = fetches.pop(fut)
+                            try:
+                                article = fut.result()
+                            except Exception as e:
+                                record_failure(english_url, e)
+                                continue
+
+                            if not article["pdf_url"]:
+                                skipped += 1
+                                append_skipped({"url": english_url, "reason": "no_pdf_url"}, skipped_fh)
+                                processed.add(english_url)
+                                continue
+
+                            # Extract full text（ダウンロードが終わったものから抽出へ回す）
+                            try:
+                                ext = cpu_ex.submit(extract_pdf_text, article["local_pdf"])
+                            except BrokenProcessPool as e:
+                                # 壊れた PDF などで子プロセスが落ちるとプールごと使えなくなる。
+                                # この記事は失敗として記録し、プールを作り直して残りの抽出を続ける
+                                # （落ちたプールに投入済みだった抽出は result() で失敗として記録される）
+                                record_failure(english_url, e)
+                                cpu_ex.shutdown(wait=False)
+                                cpu_ex = new_cpu_pool()
+                                continue
+                            extractions[ext] = (english_url, year, month, article)
+                            pending.add(ext)
+                            continue
+
+                        english_url, year, month, article = extractions.pop(fut)
+                        try:
+                            title = article["title"]
+                            pdf_url = article["pdf_url"]
+                            pdf_filename = article["pdf_filename"]
+                            local_pdf = article["local_pdf"]
+
+                            content = fut.result()
+                            logger.info(f"Extracted text length={len(content)} for {pdf_filename}")
+
+                            # Upload to storage
+                            object_path = f"beacon/{year}/{month:02d}/{pdf_filename}"
+                            if not upload_pdf_to_storage(sb, args.bucket, object_path, local_pdf):
+                                logger.info(f"Storage object unchanged, skip upload: {object_path}")
+
+                            # Upsert DB (全項目入れる)
+                            payload = {
+                                "title": title,
+                                "content": content if content else None,
+                                "source_page_url": english_url,
+                                "source_pdf_url": pdf_url,
+                                "published_year": year,
+                                "published_month": month,
+                                "pdf_bucket": args.bucket,
+                                "pdf_path": object_path,
+                            }
+                            payloads.append(payload)
+                            if len(payloads) >= UPSERT_BATCH_SIZE:
+                                flush_payloads()
+
+                        except Exception as e:
+                            record_failure(english_url, e)
+
+                    submit_more()
+        finally:
+            cpu_ex.shutdown()
+
+        flush_payloads()
+        if args.limit is not None and done >= args.limit:
+            logger.info(f"Reached limit={args.limit}. stopping.")
+    finally:
+        # 途中で落ちてもそこまでの処理済みは残す
+        checkpoint()
+        skipped_fh.close()
 
-        time.sleep(0.2)
-    
     logger.info(f"DONE. processed={done} skipped={skipped}")
     logger.info(f"Skipped log: {SKIPPED_LOG_PATH}")
 
@@ -2,11 +2,12 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+import orjson
 import requests
 from dotenv import load_dotenv
 
@@ -36,7 +37,7 @@ def rest_get(base: str, api_key: str, path: str, params: dict[str, str]) -> list
     url = f"{base}/rest/v1/{path}"
     r = requests.get(url, headers=rest_headers(api_key), params=params, timeout=60)
     r.raise_for_status()
-    return r.json()
+    return orjson.loads(r.content)
 
 
 def rest_post(base: str, api_key: str, path: str, params: dict[str, str], payload: Any) -> list[dict[str, Any]]:
@@ -44,30 +45,42 @@ def rest_post(base: str, api_key: str, path: str, params: dict[str, str], payloa
     r = requests.post(url, headers=rest_headers(api_key), params=params, json=payload, timeout=60)
     r.raise_for_status()
     # return=representation なので配列が返る
-    return r.json()
+    return orjson.loads(r.content)
 
 
-def load_all_articles(base: str, api_key: str) -> dict[str, int]:
+def rest_count(base: str, api_key: str, path: str) -> int:
+    url = f"{base}/rest/v1/{path}"
+    headers = {**rest_headers(api_key), "Prefer": "count=exact"}
+    r = requests.head(url, headers=headers, params={"select": "id"}, timeout=60)
+    r.raise_for_status()
+    # Content-Range: 0-999/1234 （0件なら */0）。無い／件数が読めない場合は空扱いにせず止める
+    content_range = r.headers.get("Content-Range", "")
+    total = content_range.rpartition("/")[2]
+    if not total.isdigit():
+        raise SystemExit(f"Cannot read row count of {path} from Content-Range: {content_range!r}")
+    return int(total)
+
+
+def load_all_articles(base: str, api_key: str, workers: int = 8) -> dict[str, int]:
     """
-    source_page_url -> article_id を全部取る（シンプル優先）
+    source_page_url -> article_id を全部取る
+    件数を先に数えて、1000件ずつのページを並列に取得する
     """
     out: dict[str, int] = {}
     limit = 1000
-    offset = 0
-    while True:
-        rows = rest_get(
+    total = rest_count(base, api_key, "ccps_chaser_articles")
+
+    def load_page(offset: int) -> list[dict[str, Any]]:
+        return rest_get(
             base,
             api_key,
             "ccps_chaser_articles",
-            params={"select": "id,source_page_url", "limit": str(limit), "offset": str(offset)},
+            params={"select": "id,source_page_url", "order": "id", "limit": str(limit), "offset": str(offset)},
         )
-        if not rows:
-            break
-        for r in rows:
-            u = (r.get("source_page_url") or "").rstrip("/")
-            if u:
-                out[u] = int(r["id"])
-        offset += limit
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for rows in ex.map(load_page, range(0, total, limit)):
+            out.update({r["source_page_url"].rstrip("/"): r["id"] for r in rows if r.get("source_page_url")})
     return out
 
 
@@ -87,7 +100,7 @@ def main():
     api_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "").strip() or require_env("SUPABASE_ANON_KEY")
 
     p = Path(args.map)
-    obj = json.loads(p.read_text(encoding="utf-8"))
+    obj = orjson.loads(p.read_bytes())
     issue2keywords: dict[str, list[str]] = obj.get("issue2keywords", {})
     if not issue2keywords:
         raise SystemExit(f"No issue2keywords in {p}")
@@ -104,9 +117,9 @@ def main():
         print("[DRY] skip DB writes")
         return
 
-    # upsert keywords
+    # upsert keywords（return=representation なので id,name がそのまま返る）
     keyword_rows = [{"name": n} for n in keyword_names]
-    _ = rest_post(
+    rows = rest_post(
         supabase_url,
         api_key,
         "ccps_keywords",
@@ -114,19 +127,8 @@ def main():
         payload=keyword_rows,
     )
 
-    # keyword name -> id を取得（確実化のためselectで引き直す）
-    name2id: dict[str, int] = {}
-    for batch in chunked(keyword_names, 100):
-        # PostgREST: name=in.(a,b,c) 形式
-        in_list = ",".join(json.dumps(x) for x in batch)  # "..." でクォートされる
-        rows = rest_get(
-            supabase_url,
-            api_key,
-            "ccps_keywords",
-            params={"select": "id,name", "name": f"in.({in_list})"},
-        )
-        for r in rows:
-            name2id[r["name"]] = int(r["id"])
+    # keyword name -> id
+    name2id: dict[str, int] = {r["name"]: r["id"] for r in rows}
 
     # 2) 記事URL -> article_id を取得
     url2id = load_all_articles(supabase_url, api_key)
@@ -2,45 +2,139 @@
 # -*- coding: utf-8 -*-
 
 import argparse
-import json
+import hashlib
+import itertools
+import os
 import re
+import tempfile
+import threading
 import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
 from urllib.parse import urljoin, urlparse, parse_qs
 
+import lxml.etree
+import lxml.html
+import orjson
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ARCHIVES_URL = "https://ccps.aiche.org/resources/process-safety-beacon/archives"
 ENGLISH_LANGUAGE_ID = "9306"  # archives の Language: English がこれ :contentReference[oaicite:5]{index=5}
+HTTP_CACHE_DIR = Path(__file__).resolve().parents[1] / ".httpcache"
+ISSUE_RE = re.compile(r"/resources/process-safety-beacon/archives/\d{4}/[^/]+/english/?$")
 
+# ワーカースレッドごとの待ち時間のずらし幅（build_keyword_to_issues の initializer で設定）
+_worker = threading.local()
 
-def fetch(url: str, session: requests.Session, timeout: int = 30) -> str:
-    r = session.get(url, timeout=timeout)
+
+def write_cache(cache_path: Path, entry: dict) -> None:
+    # 一時ファイルに書いてから置き換え、途中で落ちても壊れたキャッシュを残さない
+    HTTP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=HTTP_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(orjson.dumps(entry))
+        os.replace(tmp, cache_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def fetch(url: str, session: requests.Session, timeout: int = 30, cache_ttl: float | None = 0) -> str:
+    """
+    HTML を取得する。cache_ttl が None ならキャッシュしない。
+    それ以外は .httpcache に本文と ETag / Last-Modified を保存しておき、
+    保存から cache_ttl 秒以内ならそのまま返し、それ以降は If-None-Match / If-Modified-Since 付きで
+    取り直して 304 なら保存済みの本文を使う。
+    """
+    if cache_ttl is None:
+        r = session.get(url, timeout=timeout)
+        r.raise_for_status()
+        return r.text
+
+    cache_path = HTTP_CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+    cached = None
+    if cache_path.exists():
+        try:
+            cached = orjson.loads(cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            cached = None
+
+    if cached is not None and time.time() - cache_path.stat().st_mtime < cache_ttl:
+        return cached["text"]
+
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = session.get(url, headers=headers, timeout=timeout)
+    if cached is not None and r.status_code == 304:
+        # 変更なし: 保存済みの本文を使い、TTL の起点だけ更新する
+        os.utime(cache_path)
+        return cached["text"]
     r.raise_for_status()
+
+    write_cache(
+        cache_path,
+        {
+            "url": url,
+            "etag": r.headers.get("ETag"),
+            "last_modified": r.headers.get("Last-Modified"),
+            "text": r.text,
+        },
+    )
     return r.text
 
 
+@lru_cache(maxsize=4096)
+def absolutize(href: str) -> str:
+    # 相対URLにも対応（ページ送りで同じ href が何度も出てくるのでキャッシュする）
+    return href if href.startswith("http") else urljoin(ARCHIVES_URL, href)
+
+
+def parse_html(html: str) -> lxml.html.HtmlElement | None:
+    """
+    lxml で HTML をパースする。空のレスポンスなら None。
+    XML の encoding 宣言付きでも読めるよう UTF-8 の bytes として渡す。
+    """
+    if not html.strip():
+        return None
+    try:
+        return lxml.html.fromstring(html.encode("utf-8"), parser=lxml.html.HTMLParser(encoding="utf-8"))
+    except lxml.etree.ParserError:
+        return None
+
+
+def anchor_text(a: lxml.html.HtmlElement) -> str:
+    # BeautifulSoup の get_text(" ", strip=True) 相当
+    return " ".join(t.strip() for t in a.itertext() if t.strip())
+
+
 def extract_keyword_links(html: str) -> dict[str, str]:
     """
     archives ページから keywords フィルタのリンクを拾う。
     return: {keyword_id: keyword_name}
     """
-    soup = BeautifulSoup(html, "html.parser")
+    tree = parse_html(html)
     out: dict[str, str] = {}
+    if tree is None:
+        return out
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        text = a.get_text(" ", strip=True)
+    # keywords クエリが付くリンクだけ XPath で拾う
+    for a in tree.xpath('//a[contains(@href, "keywords=")]'):
+        href = a.get("href")
+        text = anchor_text(a)
         if not text:
             continue
 
-        # keywords クエリが付くリンクだけ拾う
-        if "keywords=" not in href:
-            continue
-
-        # 相対URLにも対応
-        full = href if href.startswith("http") else urljoin(ARCHIVES_URL, href)
+        full = absolutize(href)
         q = parse_qs(urlparse(full).query)
         kid = q.get("keywords", [None])[0]
         if kid and kid.isdigit():
@@ -49,73 +143,102 @@ def extract_keyword_links(html: str) -> dict[str, str]:
     return out
 
 
-def extract_issue_english_urls(html: str) -> set[str]:
+def extract_issues_and_next(html: str) -> tuple[set[str], bool]:
     """
-    絞り込み結果ページから英語記事URL（/archives/YYYY/month/english）を抜く。
+    絞り込み結果ページを1回だけパースして、
+    英語記事URL（/archives/YYYY/month/english）と、Drupal系のページャに "next" があるか（ゆるい判定）を返す。
     """
-    soup = BeautifulSoup(html, "html.parser")
+    tree = parse_html(html)
     urls = set()
+    has_next = False
+    if tree is None:
+        return urls, has_next
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        full = href if href.startswith("http") else urljoin(ARCHIVES_URL, href)
+    for a in tree.xpath("//a[@href]"):
+        href = a.get("href")
 
-        if re.search(r"/resources/process-safety-beacon/archives/\d{4}/[^/]+/english/?$", full):
-            urls.add(full.rstrip("/"))
+        # ISSUE_RE は末尾が english のURLにしか当たらないので、先に href の部分一致で候補を絞る
+        if "english" in href:
+            full = absolutize(href)
+            if ISSUE_RE.search(full):
+                urls.add(full.rstrip("/"))
+                continue
 
-    return urls
+        # よくある next の rel / “next” テキストを雑に拾う
+        if not has_next and (a.get("rel") == "next" or anchor_text(a).lower() == "next"):
+            has_next = True
 
+    # ページャの next の class でも拾う
+    if not has_next and tree.xpath(
+        '//*[contains(concat(" ", normalize-space(@class), " "), " pager__item--next ")]//a'
+    ):
+        has_next = True
 
-def has_next_page(html: str) -> bool:
+    return urls, has_next
+
+
+def crawl_one_keyword(
+    session: requests.Session, kid: str, sleep_sec: float, cache_ttl: float | None = 0
+) -> set[str]:
     """
-    Drupal系のページャに "next" があるかをゆるく判定
+    1キーワード分の絞り込み結果をページ送りしながら集める。
+    1ページ目も含め、毎回のリクエスト前に sleep_sec（+ ワーカーごとのずらし）だけ待つ。
+    return: set(issue_url)
     """
-    soup = BeautifulSoup(html, "html.parser")
-    # よくある next の class / rel を雑に拾う
-    if soup.select_one('a[rel="next"]'):
-        return True
-    if soup.select_one(".pager__item--next a"):
-        return True
-    # “next” テキストでも拾う
-    for a in soup.find_all("a", href=True):
-        if a.get_text(" ", strip=True).lower() == "next":
-            return True
-    return False
-
-
-def build_keyword_to_issues(session: requests.Session, keyword_ids: list[str], sleep_sec: float) -> dict[str, set[str]]:
+    issues = set()
+    page = 0
+    delay = sleep_sec + getattr(_worker, "stagger", 0.0)
+
+    while True:
+        time.sleep(delay)
+        url = f"{ARCHIVES_URL}?keywords={kid}&language={ENGLISH_LANGUAGE_ID}&page={page}"
+        html = fetch(url, session, cache_ttl=cache_ttl)
+        page_issues, has_next = extract_issues_and_next(html)
+        prev_size = len(issues)
+        issues |= page_issues
+
+        # 新しい記事が1件も増えなければ（範囲外ページで同じ一覧が返る等）その時点で終了
+        if len(issues) == prev_size:
+            break
+
+        # 次ページが無さそうなら抜ける
+        if not has_next:
+            break
+
+        page += 1
+        if page > 50:  # 念のため上限
+            break
+
+    return issues
+
+
+def build_keyword_to_issues(
+    session: requests.Session,
+    keyword_ids: list[str],
+    sleep_sec: float,
+    workers: int = 8,
+    cache_ttl: float | None = 0,
+) -> dict[str, set[str]]:
     """
+    キーワードごとのクロールをスレッドで並列に回す。
+    各ワーカーはリクエストごとに sleep_sec 待ち、同時に飛ばないようワーカー番号 × 0.1 秒ずらす。
     return: {keyword_id: set(issue_url)}
     """
-    kid2issues: dict[str, set[str]] = {}
-    for kid in keyword_ids:
-        issues = set()
-        page = 0
-
-        while True:
-            url = f"{ARCHIVES_URL}?keywords={kid}&language={ENGLISH_LANGUAGE_ID}&page={page}"
-            html = fetch(url, session)
-            issues |= extract_issue_english_urls(html)
+    worker_ids = itertools.count()
 
-            # 次ページが無さそうなら抜ける
-            if not has_next_page(html):
-                break
+    def init_worker() -> None:
+        _worker.stagger = next(worker_ids) * 0.1
 
-            page += 1
-            if page > 50:  # 念のため上限
-                break
+    with ThreadPoolExecutor(max_workers=workers, initializer=init_worker) as ex:
+        # map は入力順で返すので、出力 JSON の並びは従来どおり keyword_id 順のまま
+        results = ex.map(lambda kid: crawl_one_keyword(session, kid, sleep_sec, cache_ttl), keyword_ids)
+        return dict(zip(keyword_ids, results))
 
-            time.sleep(sleep_sec)
 
-        kid2issues[kid] = issues
-        time.sleep(sleep_sec)
-
-    return kid2issues
-
-
-def invert_to_issue_keywords(keyword_map: dict[str, str], kid2issues: dict[str, set[str]]) -> dict[str, list[str]]:
+def invert_to_issue_keywords(keyword_map: dict[str, str], kid2issues: dict[str, set[str]]) -> dict[str, set[str]]:
     """
-    issue_url -> [keyword_name, ...]
+    issue_url -> {keyword_name, ...}
+    set のまま返し、JSON 書き出し時に sorted list にする（sorted_set_default）
     """
     issue2keywords: dict[str, set[str]] = defaultdict(set)
     for kid, issues in kid2issues.items():
@@ -123,39 +246,62 @@ def invert_to_issue_keywords(keyword_map: dict[str, str], kid2issues: dict[str,
         for isu in issues:
             issue2keywords[isu].add(kname)
 
-    # set -> sorted list
-    return {isu: sorted(list(kws)) for isu, kws in issue2keywords.items()}
+    return issue2keywords
+
+
+def sorted_set_default(o: object) -> list:
+    # orjson が直接扱えない set は sorted list として書き出す
+    if isinstance(o, set):
+        return sorted(o)
+    raise TypeError
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--out", required=True, help="output json path (e.g. tools/ccps_keyword_map.json)")
     ap.add_argument("--sleep", type=float, default=0.4, help="sleep seconds between requests")
+    ap.add_argument("--workers", type=int, default=8, help="number of keywords crawled in parallel")
+    ap.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=0,
+        help="reuse cached HTML without revalidating for this many seconds (0=always revalidate)",
+    )
+    ap.add_argument("--no-cache", action="store_true", help="do not read or write .httpcache")
     args = ap.parse_args()
+    cache_ttl = None if args.no_cache else args.cache_ttl
 
     with requests.Session() as s:
         s.headers.update({"User-Agent": "ccps-chaser/1.0 (personal project)"})
+        # ワーカー数ぶん keep-alive 接続を使い回せるようプールを広げ、一時的なエラーは自動で再試行する
+        adapter = HTTPAdapter(
+            pool_connections=64,
+            pool_maxsize=max(args.workers, 1),
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
 
-        base_html = fetch(ARCHIVES_URL, s)
+        base_html = fetch(ARCHIVES_URL, s, cache_ttl=cache_ttl)
         keyword_map = extract_keyword_links(base_html)
 
         # keyword_id を安定順に
         keyword_ids = sorted(keyword_map.keys(), key=lambda x: int(x))
 
-        kid2issues = build_keyword_to_issues(s, keyword_ids, args.sleep)
+        kid2issues = build_keyword_to_issues(s, keyword_ids, args.sleep, args.workers, cache_ttl)
         issue2keywords = invert_to_issue_keywords(keyword_map, kid2issues)
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(
+    Path(args.out).write_bytes(
+        orjson.dumps(
             {
                 "archives_url": ARCHIVES_URL,
                 "language_id": ENGLISH_LANGUAGE_ID,
                 "issue2keywords": issue2keywords,
             },
-            f,
-            ensure_ascii=False,
-            indent=2,
+            default=sorted_set_default,
+            option=orjson.OPT_INDENT_2,
         )
+    )
 
     print(f"[OK] wrote: {args.out}")
     print(f"[OK] issues with at least 1 keyword: {len(issue2keywords)}")